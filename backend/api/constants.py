@@ -1 +1,17 @@
 PAGE_SIZE = 6
+
+
+BASE64_STREAM_THRESHOLD = 256 * 1024
+BASE64_CHUNK_SIZE = 64 * 1024
+
+TAG_IDS_CACHE_KEY = 'tag_ids_by_slug'
+TAG_IDS_CACHE_TIMEOUT = 60 * 60
+
+COUNT_CACHE_TIMEOUT = 60
+COUNT_ESTIMATE_THRESHOLD = 10_000
+
+STREAM_CHUNK_SIZE = 500
+
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+SHORTLINK_PREFIX_CACHE_SIZE = 16
@@ -1,13 +1,41 @@
+from django.core.cache import cache
 from django_filters import rest_framework as filters
 
 from recipes.models import Ingredient, Recipe, Tag
+from api.constants import TAG_IDS_CACHE_KEY, TAG_IDS_CACHE_TIMEOUT
+
+
+def get_tag_ids():
+    """Id тегов по слагам из кэша, сбрасывается в api.signals."""
+    return cache.get_or_set(
+        TAG_IDS_CACHE_KEY,
+        lambda: dict(Tag.objects.values_list('slug', 'id')),
+        TAG_IDS_CACHE_TIMEOUT
+    )
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_tag_ids()]
+
+
+class FastDjangoFilterBackend(filters.DjangoFilterBackend):
+    """Не создаёт FilterSet, если в запросе нет ни одного его параметра."""
+
+    def filter_queryset(self, request, queryset, view):
+        filterset_class = self.get_filterset_class(view, queryset)
+        if filterset_class is None or not any(
+            name in request.query_params
+            for name in filterset_class.base_filters
+        ):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
 
 
 class IngredientFilter(filters.FilterSet):
     """Фильтрация для модели Ingredient."""
     name = filters.CharFilter(
         field_name='name',
-        lookup_expr='icontains'
+        lookup_expr='istartswith'
     )
 
     class Meta:
@@ -17,10 +45,10 @@ class IngredientFilter(filters.FilterSet):
 
 class RecipeFilter(filters.FilterSet):
     """Фильтрация для модели Recipe."""
-    tags = filters.ModelMultipleChoiceFilter(
+    tags = filters.MultipleChoiceFilter(
         field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+        choices=get_tag_choices,
+        method='filter_tags'
     )
 
     is_favorited = filters.BooleanFilter(
@@ -35,6 +63,16 @@ class RecipeFilter(filters.FilterSet):
         model = Recipe
         fields = ['tags', 'author']
 
+    def filter_tags(self, queryset, item, value):
+        # Пересечение с Recipe.tag_ids идёт по GIN-индексу без
+        # соединения с RecipeTag.
+        tag_ids = get_tag_ids()
+        return queryset.filter(
+            tag_ids__overlap=[
+                tag_ids[slug] for slug in value if slug in tag_ids
+            ]
+        )
+
     def filter_is_favorited(self, queryset, item, value):
         if value and self.request.user.is_authenticated:
             return queryset.filter(favorites__user=self.request.user)
@@ -1,8 +1,77 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework import pagination
 
-from .constants import PAGE_SIZE
+from .constants import COUNT_CACHE_TIMEOUT, COUNT_ESTIMATE_THRESHOLD, PAGE_SIZE
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Кэширует COUNT(*) по тексту запроса на короткое время. Для больших
+    таблиц без фильтров берёт оценку числа строк из статистики PostgreSQL.
+    """
+
+    @cached_property
+    def count(self):
+        try:
+            sql = str(self.object_list.query)
+        except EmptyResultSet:
+            return 0
+        key = 'pagination_count:' + hashlib.md5(sql.encode()).hexdigest()
+        return cache.get_or_set(key, self.get_count, COUNT_CACHE_TIMEOUT)
+
+    def get_count(self):
+        if not self.object_list.query.where:
+            estimate = self.estimate_count()
+            if estimate > COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return self.object_list.count()
+
+    def estimate_count(self):
+        with connections[self.object_list.db].cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [self.object_list.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
 
 
 class CustomPagination(pagination.PageNumberPagination):
+    django_paginator_class = CachedCountPaginator
+    page_size = PAGE_SIZE
+    page_size_query_param = 'limit'
+    # Списки текущего пользователя меняются его же запросами, поэтому
+    # их COUNT(*) не кэшируется: иначе count отстаёт от results.
+    user_filter_params = ('is_favorited', 'is_in_shopping_cart')
+    user_actions = ('subscriptions',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_user_list(request, view):
+            self.django_paginator_class = Paginator
+        else:
+            self.django_paginator_class = CachedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_user_list(self, request, view):
+        if getattr(view, 'action', None) in self.user_actions:
+            return True
+        return any(
+            param in request.query_params for param in self.user_filter_params
+        )
+
+
+class RecipeCursorPagination(pagination.CursorPagination):
+    """
+    Курсорная пагинация без COUNT(*) и OFFSET.
+    Включается параметром cursor, пустое значение - первая страница.
+    """
+
     page_size = PAGE_SIZE
     page_size_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
@@ -7,10 +7,12 @@ class ReadOrAuthorOnly(permissions.BasePermission):
     Или все запросы только для админа и суперпользователя.
     """
 
+    SAFE = frozenset(permissions.SAFE_METHODS)
+
     def has_permission(self, request, view):
-        return (request.method in permissions.SAFE_METHODS
+        return (request.method in self.SAFE
                 or request.user.is_authenticated)
 
     def has_object_permission(self, request, view, obj):
-        return (request.method in permissions.SAFE_METHODS
-                or obj.author == request.user)
+        return (request.method in self.SAFE
+                or obj.author_id == request.user.id)
@@ -0,0 +1,24 @@
+import orjson
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(renderers.BaseRenderer):
+    """
+    JSON через orjson. Типы, которые orjson не знает (Decimal, ленивые
+    строки переводов), отдаются стандартному кодировщику DRF.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
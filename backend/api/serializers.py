@@ -1,18 +1,57 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
 from rest_framework import serializers
 
 from users.models import Follow
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+from recipes.constants import MAX_INGREDIENT_AMOUNT
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 from api.utils import Base64ImageField
 
 User = get_user_model()
 
 
+class RequestUserMixin:
+    """Запоминает запрос и пользователя из контекста один раз."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._request = self.context.get('request')
+        self._user = getattr(self._request, 'user', None)
+
+
+class DynamicFieldsMixin:
+    """
+    Оставляет только поля, перечисленные в параметре запроса fields,
+    и убирает поля из параметра omit (через запятую).
+    """
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        field_names = cls.Meta.fields
+        params = request.query_params if request else {}
+        if params.get('fields'):
+            requested = {name.strip() for name in params['fields'].split(',')}
+            field_names = [name for name in field_names if name in requested]
+        if params.get('omit'):
+            omitted = {name.strip() for name in params['omit'].split(',')}
+            field_names = [
+                name for name in field_names if name not in omitted
+            ]
+        return field_names
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        field_names = set(self.get_requested_fields(request))
+        for name in set(self.fields) - field_names:
+            self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     avatar = Base64ImageField(required=False, allow_null=True)
-    is_subscribed = serializers.SerializerMethodField()
+    is_subscribed = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = User
@@ -35,10 +74,24 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-    def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        return (request and request.user.is_authenticated and Follow.objects.
-                filter(user=request.user, author=obj).exists())
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Автор рецепта только для чтения, без полей записи UserSerializer."""
+
+    is_subscribed = serializers.BooleanField(read_only=True, default=False)
+
+    class Meta:
+        model = User
+        fields = (
+            'id',
+            'email',
+            'username',
+            'first_name',
+            'last_name',
+            'is_subscribed',
+            'avatar'
+        )
+        read_only_fields = fields
 
 
 class UserAvatarSerializer(serializers.ModelSerializer):
@@ -63,6 +116,13 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = '__all__'
 
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'slug': instance.slug
+        }
+
 
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
@@ -71,11 +131,8 @@ class IngredientSerializer(serializers.ModelSerializer):
 
 
 class IngredientsAddSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        source='ingredient'
-    )
-    amount = serializers.IntegerField()
+    id = serializers.IntegerField()
+    amount = serializers.IntegerField(max_value=MAX_INGREDIENT_AMOUNT)
 
     class Meta:
         model = RecipeIngredient
@@ -104,17 +161,19 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
+class RecipeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
     ingredients = RecipeIngredientSerializer(
         many=True,
         source='recipe_ingredient'
     )
     image = Base64ImageField(required=False, allow_null=True)
-    amount = RecipeIngredientSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True)
-    is_favorited = serializers.SerializerMethodField(read_only=True)
-    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_shopping_cart = serializers.BooleanField(
+        read_only=True,
+        default=False
+    )
 
     class Meta:
         model = Recipe
@@ -123,7 +182,6 @@ class RecipeSerializer(serializers.ModelSerializer):
             'tags',
             'author',
             'ingredients',
-            'amount',
             'name',
             'image',
             'text',
@@ -132,22 +190,6 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
         )
 
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Favorite.objects.filter(
-                user=request.user,
-                recipe=obj).exists()
-        return False
-
-    def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return ShoppingCart.objects.filter(
-                user=request.user,
-                recipe=obj).exists()
-        return False
-
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
     ingredients = IngredientsAddSerializer(many=True)
@@ -167,25 +209,13 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'author'
         ]
 
-    def add_ingredients(self, ingredients, recipe):
-        RecipeIngredient.objects.bulk_create([
-            RecipeIngredient(
-                recipe=recipe,
-                ingredient=ingredient.get('ingredient'),
-                amount=ingredient.get('amount')
-            )
-            for ingredient in ingredients
-        ])
-
     def validate_ingredients(self, ingredients):
         if not ingredients:
             raise serializers.ValidationError(
                 'Требуется хотя бы один ингредиент'
             )
 
-        ingredient_ids = [
-            ingredient.get('ingredient').id for ingredient in ingredients
-        ]
+        ingredient_ids = [ingredient.get('id') for ingredient in ingredients]
         if len(set(ingredient_ids)) != len(ingredient_ids):
             raise serializers.ValidationError(
                 'Нельзя дублировать ингредиенты'
@@ -197,6 +227,16 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                     'Количество ингредиентов должно быть больше нуля.'
                 )
 
+        found = Ingredient.objects.in_bulk(ingredient_ids)
+        missing = set(ingredient_ids) - found.keys()
+        if missing:
+            raise serializers.ValidationError(
+                'Ингредиенты не найдены: '
+                + ', '.join(str(pk) for pk in sorted(missing))
+            )
+        for ingredient in ingredients:
+            ingredient['ingredient'] = found[ingredient['id']]
+
         return ingredients
 
     def validate_tags(self, tags):
@@ -216,94 +256,56 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return tags
 
     def validate(self, attrs):
-        attrs['ingredients'] = (
-            self.validate_ingredients(attrs.get('ingredients', []))
-        )
-        attrs['tags'] = self.validate_tags(attrs.get('tags', []))
+        # При частичном обновлении валидаторы полей выше не вызываются для
+        # отсутствующих полей, поэтому здесь проверяем только их наличие.
+        if not attrs.get('ingredients'):
+            raise serializers.ValidationError(
+                'Требуется хотя бы один ингредиент'
+            )
+        if not attrs.get('tags'):
+            raise serializers.ValidationError(
+                'Требуется хотя бы один тег'
+            )
         return attrs
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
-        self.add_ingredients(ingredients, recipe)
+        RecipeIngredient.bulk_add(recipe, ingredients)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
-        instance.recipe_ingredient.all().delete()
-        self.add_ingredients(ingredients, instance)
-        instance.tags.set(validated_data.pop('tags'))
-        return super().update(instance, validated_data)
+        tags = validated_data.pop('tags')
+        # Сначала сохраняем сам рецепт: save() после tags.set() записал бы
+        # устаревший tag_ids из памяти поверх пересчитанного сигналом.
+        instance = super().update(instance, validated_data)
+        RecipeIngredient.bulk_set(instance, ingredients)
+        instance.tags.set(tags)
+        return instance
 
     def to_representation(self, instance):
-        return RecipeSerializer(
-            instance,
-            context={
-                'request': self.context.get('request')
-            }
-        ).data
+        # Перечитываем рецепт тем же запросом, что и при чтении: с
+        # prefetch связей и аннотациями is_favorited/is_in_shopping_cart.
+        view = self.context.get('view')
+        if view is not None:
+            instance = view.get_queryset().get(pk=instance.pk)
+        return RecipeSerializer(instance, context=self.context).data
 
 
-class ShortRecipeSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
-
-    class Meta:
-        model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
-
-
-class FavoriteSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Favorite
-        fields = ('user', 'recipe')
-
-    def validate_recipe(self, recipe):
-        request = self.context['request']
-        user = request.user
-
-        if request.method == 'POST':
-            if Favorite.objects.filter(
-                    user=user,
-                    recipe=recipe
-            ).exists():
-                raise serializers.ValidationError(
-                    {'errors': 'Рецепт уже есть в избранном'},
-                )
-        if request.method == 'DELETE' and not Favorite.objects.filter(
-                user=user,
-                recipe=recipe
-        ).exists():
-            raise serializers.ValidationError(
-                'Рецепт не найден в избранном'
-            )
-        return recipe
-
-
-class ShoppingCartSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ShoppingCart
-        fields = ('user', 'recipe')
-
-    def validate_recipe(self, recipe):
-        request = self.context.get('request')
-        user = request.user
-
-        if request.method == 'POST':
-            if ShoppingCart.objects.filter(
-                    user=user,
-                    recipe=recipe
-            ).exists():
-                raise serializers.ValidationError('Рецепт уже есть в корзине')
-
-        if request.method == 'DELETE':
-            if not ShoppingCart.objects.filter(
-                    user=user,
-                    recipe=recipe
-            ).exists():
-                raise serializers.ValidationError('Рецепт не найден в корзине')
-        return recipe
+def short_recipe_data(recipe, request):
+    """Краткое представление рецепта без построения сериализатора."""
+    return {
+        'id': recipe.id,
+        'name': recipe.name,
+        'image': (request.build_absolute_uri(recipe.image.url)
+                  if recipe.image else None),
+        'cooking_time': recipe.cooking_time,
+    }
 
 
 class FollowRecipeSerializer(serializers.ModelSerializer):
@@ -317,32 +319,34 @@ class FollowRecipeSerializer(serializers.ModelSerializer):
         )
 
 
-class UserFollowSerializer(UserSerializer):
-    recipes_count = serializers.SerializerMethodField(read_only=True)
+class UserFollowSerializer(RequestUserMixin, UserSerializer):
+    recipes_count = serializers.IntegerField(read_only=True)
     recipes = serializers.SerializerMethodField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ('recipes_count', 'recipes')
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        limit = (self._request.query_params.get('recipes_limit')
+                 if self._request else None)
+        self._recipes_limit = int(limit) if limit else None
 
     def get_recipes(self, obj):
-        limit = self.context['request'].query_params.get('recipes_limit')
         recipes = obj.recipes.all()
-        if limit:
-            recipes = recipes[:int(limit)]
+        if self._recipes_limit:
+            recipes = recipes[:self._recipes_limit]
         serializer = FollowRecipeSerializer(recipes, many=True, read_only=True)
         return serializer.data
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(RequestUserMixin, serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ('user', 'author')
 
     def validate_author(self, author):
-        user = self.context['request'].user
+        user = self._user
 
         if user == author:
             raise serializers.ValidationError(
@@ -355,7 +359,9 @@ class FollowSerializer(serializers.ModelSerializer):
         return author
 
     def to_representation(self, instance):
-        context = self.context
-        context['request'].user = instance.user
-        serializer = UserFollowSerializer(instance.author, context=context)
+        author = User.objects.annotate(
+            recipes_count=Count('recipes')
+        ).get(pk=instance.author_id)
+        author.is_subscribed = True
+        serializer = UserFollowSerializer(author, context=self.context)
         return serializer.data
@@ -0,0 +1,13 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Tag
+from api.constants import TAG_IDS_CACHE_KEY
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_ids(**kwargs):
+    """Сбрасывает закэшированные id тегов при их изменении."""
+    cache.delete(TAG_IDS_CACHE_KEY)
@@ -11,7 +11,6 @@ router_v1.register(r'users', UserViewSet, basename='user')
 
 
 urlpatterns = [
-    path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
     path('', include(router_v1.urls))
 ]
@@ -1,16 +1,74 @@
 import base64
 import uuid
+from functools import lru_cache
 
 from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.urls import reverse
 from rest_framework import serializers
 
+from api.constants import (BASE64_CHUNK_SIZE, BASE64_STREAM_THRESHOLD,
+                           SHORTLINK_PREFIX_CACHE_SIZE)
+
+
+class Base64TemporaryFile(TemporaryUploadedFile):
+    """
+    Временный файл для декодированного изображения. Хранилище перемещает
+    его на место, поэтому закрываем его сами, не удаляя повторно.
+    """
+
+    def __del__(self):
+        self.close()
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            header, data = data.split(';base64,')
-            content_ext = header.split('/')[-1]
-            gen_id = str(uuid.uuid4())[:12]
-            file_name = f"{gen_id}.{content_ext}"
-            data = ContentFile(base64.b64decode(data), name=file_name)
+            try:
+                data = self.decode(data)
+            except ValueError:
+                # binascii.Error - подкласс ValueError.
+                self.fail('invalid_image')
         return super().to_internal_value(data)
+
+    def decode(self, data):
+        header, data = data.split(';base64,')
+        content_ext = header.split('/')[-1]
+        gen_id = str(uuid.uuid4())[:12]
+        file_name = f"{gen_id}.{content_ext}"
+        # Переносы строк и пробелы сдвинули бы границы частей
+        # относительно групп по 4 символа base64.
+        data = ''.join(data.split())
+        if len(data) > BASE64_STREAM_THRESHOLD:
+            return self.decode_to_temporary_file(
+                data, file_name, header[len('data:'):]
+            )
+        return ContentFile(
+            base64.b64decode(data, validate=True),
+            name=file_name
+        )
+
+    @staticmethod
+    def decode_to_temporary_file(data, file_name, content_type):
+        """Декодирует большое изображение во временный файл по частям."""
+        uploaded = Base64TemporaryFile(file_name, content_type, 0, None)
+        try:
+            for start in range(0, len(data), BASE64_CHUNK_SIZE):
+                uploaded.write(base64.b64decode(
+                    data[start:start + BASE64_CHUNK_SIZE],
+                    validate=True
+                ))
+        except ValueError:
+            uploaded.close()
+            raise
+        uploaded.size = uploaded.tell()
+        uploaded.seek(0)
+        return uploaded
+
+
+@lru_cache(maxsize=SHORTLINK_PREFIX_CACHE_SIZE)
+def get_shortlink_parts(scheme, host):
+    """Начало и конец короткой ссылки для схемы и хоста."""
+    path = reverse('shortlink', kwargs={'short_code': '_'})
+    prefix, suffix = path.rsplit('_', 1)
+    return f'{scheme}://{host}{prefix}', suffix
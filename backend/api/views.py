@@ -1,13 +1,17 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse
-from django.utils import baseconv
-from django_filters.rest_framework import DjangoFilterBackend
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, CharField, Count, Exists,
+                              OuterRef, Prefetch, Sum, Value)
+from django.db.models.functions import Cast, Concat
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
 from djoser import views as djoser_views
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
@@ -17,38 +21,152 @@ from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
                             ShoppingCart, Tag)
 from users.models import Follow
 
+from .constants import REFERENCE_CACHE_TIMEOUT, STREAM_CHUNK_SIZE
 from .filters import IngredientFilter, RecipeFilter
-from .pagination import CustomPagination
+from .pagination import CustomPagination, RecipeCursorPagination
 from .permissions import ReadOrAuthorOnly
-from .serializers import (FavoriteSerializer, FollowSerializer,
-                          IngredientSerializer, RecipeCreateSerializer,
-                          RecipeSerializer, ShoppingCartSerializer,
-                          ShortRecipeSerializer, TagSerializer,
-                          UserAvatarSerializer, UserFollowSerializer,
-                          UserSerializer)
+from .serializers import (FollowSerializer, IngredientSerializer,
+                          RecipeCreateSerializer, RecipeSerializer,
+                          TagSerializer, UserAvatarSerializer,
+                          UserFollowSerializer, UserSerializer,
+                          short_recipe_data)
+from .utils import get_shortlink_parts
 
 User = get_user_model()
 
 
+@method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT), name='list')
+@method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT), name='retrieve')
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
 
+@method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT), name='list')
+@method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT), name='retrieve')
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     search_fields = ('name',)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class UserRecipeRelationMixin:
+    """Добавление рецепта в избранное или корзину и удаление из них."""
+
+    def _add(self, model, error):
+        recipe = self.get_object()
+        # Один INSERT вместо проверки уникальности отдельным SELECT:
+        # повтор отсекает ограничение unique в базе.
+        try:
+            with transaction.atomic():
+                model.objects.create(user=self.request.user, recipe=recipe)
+        except IntegrityError:
+            return Response(
+                {'errors': error},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            short_recipe_data(recipe, self.request),
+            status=status.HTTP_201_CREATED
+        )
+
+    def _remove(self, model, error):
+        try:
+            recipe_id = Recipe._meta.pk.to_python(self.kwargs['pk'])
+        except ValidationError:
+            raise Http404
+        deleted, _ = model.objects.filter(
+            user=self.request.user,
+            recipe_id=recipe_id
+        ).delete()
+        if not deleted:
+            get_object_or_404(Recipe.objects.only('id'), pk=recipe_id)
+            return Response(
+                {'errors': error},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RecipeViewSet(UserRecipeRelationMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = (ReadOrAuthorOnly,)
     pagination_class = CustomPagination
     filterset_class = RecipeFilter
+    # Действиям со связями рецепта не нужна вся строка и prefetch.
+    object_only_fields = {
+        'favorite': ('id', 'name', 'image', 'cooking_time'),
+        'shopping_cart': ('id', 'name', 'image', 'cooking_time'),
+        'get_link': ('id', 'short_code'),
+    }
+
+    @property
+    def paginator(self):
+        cursor_param = RecipeCursorPagination.cursor_query_param
+        if cursor_param in self.request.query_params:
+            self.pagination_class = RecipeCursorPagination
+        return super().paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        fields = RecipeSerializer.get_requested_fields(self.request)
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'recipe_ingredient',
+                    queryset=RecipeIngredient.objects.select_related(
+                        'ingredient'
+                    ).order_by('ingredient__name').seal()
+                )
+            )
+        if 'author' in fields and user.is_authenticated:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'author',
+                    queryset=User.objects.annotate(
+                        is_subscribed=Exists(Follow.objects.filter(
+                            user=user,
+                            author=OuterRef('pk')
+                        ))
+                    ).seal()
+                )
+            )
+        elif 'author' in fields:
+            queryset = queryset.select_related('author')
+        if 'is_favorited' in fields and user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorited=Exists(
+                    Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+                )
+            )
+        if 'is_in_shopping_cart' in fields and user.is_authenticated:
+            queryset = queryset.annotate(
+                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user=user,
+                    recipe=OuterRef('pk')
+                ))
+            )
+        if self.action in ('list', 'retrieve'):
+            # Ленивая загрузка связанных объектов при чтении - это N+1,
+            # seal() превращает её в предупреждение UnsealedAttributeAccess.
+            queryset = queryset.seal()
+        return queryset
+
+    def get_object(self):
+        fields = self.object_only_fields.get(self.action)
+        if fields is None:
+            return super().get_object()
+        recipe = get_object_or_404(
+            Recipe.objects.only(*fields),
+            pk=self.kwargs['pk']
+        )
+        self.check_object_permissions(self.request, recipe)
+        return recipe
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -64,43 +182,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def favorite(self, request, pk=None):
-        recipe = self.get_object()
-        user = request.user
-        serializer = FavoriteSerializer(
-            data={
-                'recipe': recipe.id,
-                'user': user.id
-            },
-            context={
-                'request': request
-            }
-        )
-        serializer.is_valid(raise_exception=True)
-        favorite, created = Favorite.objects.get_or_create(
-            user=user,
-            recipe=recipe
-        )
-        serializer = ShortRecipeSerializer(favorite.recipe)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return self._add(Favorite, 'Рецепт уже есть в избранном')
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk=None):
-        recipe = self.get_object()
-        user = request.user
-        serializer = FavoriteSerializer(
-            data={
-                'recipe': recipe.id,
-                'user': user.id
-            },
-            context={'request': request}
-        )
-        serializer.is_valid(raise_exception=True)
-        favorite = Favorite.objects.get(
-            user=user,
-            recipe=recipe
-        )
-        favorite.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return self._remove(Favorite, 'Рецепт не найден в избранном')
 
     @action(
         detail=True,
@@ -108,52 +194,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def shopping_cart(self, request, pk=None):
-        recipe = self.get_object()
-        user = request.user
-        serializer = ShoppingCartSerializer(
-            data={
-                'recipe': recipe.id,
-                'user': user.id
-            },
-            context={
-                'request': request
-            }
-        )
-        serializer.is_valid(raise_exception=True)
-        cart_item = ShoppingCart.objects.create(
-            user=user,
-            recipe=recipe
-        )
-        serializer = ShortRecipeSerializer(cart_item.recipe)
-        return Response(
-            serializer.data,
-            status=status.HTTP_201_CREATED
-        )
+        return self._add(ShoppingCart, 'Рецепт уже есть в корзине')
 
-    @action(
-        detail=True,
-        methods=['delete'],
-        permission_classes=[IsAuthenticated]
-    )
-    def delete(self, request, pk=None):
-        recipe = self.get_object()
-        user = request.user
-        serializer = ShoppingCartSerializer(
-            data={
-                'recipe': recipe.id,
-                'user': user.id
-            },
-            context={
-                'request': request
-            }
-        )
-        serializer.is_valid(raise_exception=True)
-        cart_item = ShoppingCart.objects.get(
-            user=user,
-            recipe=recipe
-        )
-        cart_item.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    @shopping_cart.mapping.delete
+    def delete_shopping_cart(self, request, pk=None):
+        return self._remove(ShoppingCart, 'Рецепт не найден в корзине')
 
     @action(
         methods=['get'],
@@ -161,25 +206,36 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def download_shopping_cart(self, request):
-        user = request.user
-        ingredients = (RecipeIngredient.objects
-                       .filter(recipe__shopping_carts__user=user)
-                       .values('ingredient__name',
-                               'ingredient__measurement_unit'
-                               )
-                       .annotate(amount=Sum('amount')))
-
-        content = ['Список покупок:\n']
-        for item in ingredients:
-            content.append(f"{item['ingredient__name']} - {item['amount']}"
-                           f" {item['ingredient__measurement_unit']}\n")
-
-        response = HttpResponse(content, content_type="text/plain")
+        lines = (RecipeIngredient.objects
+                 .filter(recipe__shopping_carts__user=request.user)
+                 .values('ingredient__name', 'ingredient__measurement_unit')
+                 .annotate(amount=Sum('amount'))
+                 .annotate(line=Concat(
+                     'ingredient__name',
+                     Value(' - '),
+                     Cast('amount', CharField()),
+                     Value(' '),
+                     'ingredient__measurement_unit',
+                     output_field=CharField()
+                 ))
+                 .order_by('ingredient__name')
+                 .values_list('line', flat=True))
+
+        response = StreamingHttpResponse(
+            self.iter_shopping_list(lines),
+            content_type="text/plain"
+        )
         response['Content-Disposition'] = (
             'attachment; filename="Shopping_List.txt"'
         )
         return response
 
+    @staticmethod
+    def iter_shopping_list(lines):
+        yield 'Список покупок:\n'
+        for line in lines.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            yield line + '\n'
+
     @action(
         methods=['get'],
         detail=True,
@@ -188,22 +244,21 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def get_link(self, request, pk=None):
         recipe = self.get_object()
-        encode_id = baseconv.base64.encode(recipe.id)
-        short_link = request.build_absolute_uri(
-            reverse('shortlink', kwargs={'encoded_id': encode_id})
+        prefix, suffix = get_shortlink_parts(
+            request.scheme,
+            request.get_host()
         )
+        short_link = f'{prefix}{recipe.short_code}{suffix}'
         return Response({'short-link': short_link}, status=status.HTTP_200_OK)
 
 
 class ShortLinkView(APIView):
-    def get(self, request, encoded_id):
-        if not set(encoded_id).issubset(set(baseconv.BASE64_ALPHABET)):
-            return Response(
-                {'error': 'Недопустимые символы в короткой ссылке.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        recipe_id = baseconv.base64.decode(encoded_id)
-        return redirect(f'/recipes/{recipe_id}/', )
+    def get(self, request, short_code):
+        recipe = get_object_or_404(
+            Recipe.objects.only('id'),
+            short_code=short_code
+        )
+        return redirect(f'/recipes/{recipe.id}/')
 
 
 class UserViewSet(djoser_views.UserViewSet):
@@ -212,6 +267,17 @@ class UserViewSet(djoser_views.UserViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,)
     pagination_class = CustomPagination
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.annotate(
+            is_subscribed=Exists(
+                Follow.objects.filter(user=user, author=OuterRef('pk'))
+            )
+        )
+
     @action(
         detail=False,
         methods=['put', 'delete'],
@@ -243,7 +309,19 @@ class UserViewSet(djoser_views.UserViewSet):
     )
     def subscriptions(self, request):
         user = request.user
-        queryset = User.objects.filter(authors__user=user)
+        # С GROUP BY от Count Django не применяет Meta.ordering,
+        # поэтому порядок для пагинации задаём явно.
+        queryset = User.objects.filter(authors__user=user).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+            recipes_count=Count('recipes')
+        ).order_by('username').prefetch_related(
+            Prefetch(
+                'recipes',
+                queryset=Recipe.objects.only(
+                    'id', 'name', 'image', 'cooking_time', 'author'
+                )
+            )
+        )
         pages = self.paginate_queryset(queryset)
         serializer = UserFollowSerializer(
             pages, many=True, context={'request': request}
@@ -258,7 +336,7 @@ class UserViewSet(djoser_views.UserViewSet):
     def subscribe(self, request, **kwargs):
         author_id = self.kwargs.get('id')
         user = request.user
-        author = get_object_or_404(User, id=author_id)
+        author = get_object_or_404(User.objects.only('id'), id=author_id)
         serializer = FollowSerializer(
             data={
                 'user': user.id,
@@ -270,19 +348,20 @@ class UserViewSet(djoser_views.UserViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    @action(
-        detail=True,
-        methods=['delete']
-    )
-    def delete(self, request, **kwargs):
-        author_id = self.kwargs.get('id')
-        user = request.user
-        author = get_object_or_404(User, id=author_id)
-        if not Follow.objects.filter(user=user, author=author).exists():
+    @subscribe.mapping.delete
+    def unsubscribe(self, request, **kwargs):
+        try:
+            author_id = User._meta.pk.to_python(self.kwargs['id'])
+        except ValidationError:
+            raise Http404
+        deleted, _ = Follow.objects.filter(
+            user=request.user,
+            author_id=author_id
+        ).delete()
+        if not deleted:
+            get_object_or_404(User.objects.only('id'), id=author_id)
             return Response(
                 'Подписка не найдена',
                 status=status.HTTP_400_BAD_REQUEST
             )
-        follow = get_object_or_404(Follow, user=user, author=author)
-        follow.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,8 +1,10 @@
 import os
+import warnings
 from pathlib import Path
 
 from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
+from seal.exceptions import UnsealedAttributeAccess
 
 load_dotenv()
 
@@ -12,6 +14,11 @@ SECRET_KEY = os.getenv('SECRET_KEY', get_random_secret_key())
 
 DEBUG = False
 
+# Ленивая загрузка связей в запечатанных запросах (N+1) становится
+# исключением, если задать SEAL_WARNINGS_AS_ERRORS=true.
+if os.getenv('SEAL_WARNINGS_AS_ERRORS', 'false').lower() == 'true':
+    warnings.filterwarnings('error', category=UnsealedAttributeAccess)
+
 ALLOWED_HOSTS = ['158.160.14.63', '127.0.0.1', 'localhost', 'foodgramenjoyer.bounceme.net']
 
 
@@ -22,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework.authtoken',
     'rest_framework',
     'djoser',
@@ -146,8 +154,12 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend'
+        'api.filters.FastDjangoFilterBackend'
     ],
 
 }
@@ -20,5 +20,5 @@ from django.urls import include, path
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
-    path('s/<str:encoded_id>/', ShortLinkView.as_view(), name='shortlink'),
+    path('s/<str:short_code>/', ShortLinkView.as_view(), name='shortlink'),
 ]
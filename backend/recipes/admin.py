@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.contrib.postgres.search import TrigramSimilarity
 
 from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
 
@@ -20,20 +22,33 @@ class IngredientAdmin(admin.ModelAdmin):
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'author', 'favorite_counter')
-    search_fields = ('name', 'author__username', 'tags__name')
+    search_fields = ('name',)
     list_filter = ('tags__name',)
     empty_value_display = 'Нет Информации'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(name__trigram_similar=search_term), False
+
+    def get_ordering(self, request):
+        search_term = request.GET.get(SEARCH_VAR)
+        if search_term:
+            return (TrigramSimilarity('name', search_term).desc(),)
+        return super().get_ordering(request)
+
     @admin.display(
-        description='Общее число добавлений этого рецепта в избранное'
+        description='Общее число добавлений этого рецепта в избранное',
+        ordering='favorites_count'
     )
     def favorite_counter(self, obj):
-        return Favorite.objects.filter(recipe=obj).count()
+        return obj.favorites_count
 
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
     search_fields = ('recipe__name', 'author__username')
     empty_value_display = 'Нет Информации'
 
@@ -41,5 +56,6 @@ class FavoriteAdmin(admin.ModelAdmin):
 @admin.register(ShoppingCart)
 class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
     search_fields = ('user__name', 'recipe__name')
     empty_value_display = 'Нет Информации'
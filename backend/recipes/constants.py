@@ -4,4 +4,16 @@ TAG_CONSTANT = 32
 
 MIN_COOKING_TIME = 1
 
+MAX_COOKING_TIME = 32767
+
 MIN_INGREDIENT_AMOUNT = 1
+
+MAX_INGREDIENT_AMOUNT = 32767
+
+BATCH_SIZE = 500
+
+IMPORT_BATCH_SIZE = 1000
+
+SHORT_CODE_BYTES = 8
+
+SHORT_CODE_MAX_LENGTH = 11
@@ -1,7 +1,8 @@
-import json
-
+import ijson
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
+from recipes.constants import IMPORT_BATCH_SIZE
 from recipes.models import Ingredient
 
 
@@ -16,22 +17,29 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         filepath = options['filepath']
         try:
-            with open(filepath, encoding='utf-8') as file:
-                data = json.load(file)
-                ingredients = [
-                    Ingredient(name=item['name'],
-                               measurement_unit=item['measurement_unit']
-                               ) for item in data]
-                Ingredient.objects.bulk_create(ingredients)
-                self.stdout.write(
-                    'Данные для модели Ingredient успешно импортированы'
-                )
+            with open(filepath, 'rb') as file, transaction.atomic():
+                self.import_ingredients(file)
         except FileNotFoundError as err:
             self.stdout.write(f'Файл с указанным названием {filepath} '
                               f'не найден. Путь: {err}')
-        except json.JSONDecodeError as err:
+        except ijson.JSONError as err:
             self.stdout.write(self.style.ERROR(
                 f'Ошибка чтения JSON файла {filepath}: {err}')
             )
-        except Exception as err:
-            self.stdout.write(self.style.ERROR(f'Произошла ошибка: {err}'))
+        else:
+            self.stdout.write(
+                'Данные для модели Ingredient успешно импортированы'
+            )
+
+    def import_ingredients(self, file):
+        """Читает файл потоком и сохраняет ингредиенты пачками."""
+        batch = []
+        for item in ijson.items(file, 'item'):
+            batch.append(Ingredient(
+                name=item['name'],
+                measurement_unit=item['measurement_unit']
+            ))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                batch.clear()
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
@@ -0,0 +1,21 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Индекс для поиска ингредиентов по началу названия: istartswith
+    в PostgreSQL строится как UPPER(name::text) LIKE UPPER('...%').
+    """
+
+    dependencies = [
+        ('recipes', '0006_auto_20261015_0956'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='ingredient_name_upper_idx'),
+        ),
+    ]
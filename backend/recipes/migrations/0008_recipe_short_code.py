@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+import recipes.models
+
+# Алфавит django.utils.baseconv.base64, которым кодировались
+# прежние короткие ссылки.
+BASE64_ALPHABET = (
+    '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+)
+
+
+def encode_id(number):
+    code = ''
+    while True:
+        number, digit = divmod(number, len(BASE64_ALPHABET))
+        code = BASE64_ALPHABET[digit] + code
+        if not number:
+            return code
+
+
+def fill_short_codes(apps, schema_editor):
+    """Сохраняет уже выданные ссылки: код существующего рецепта - его id."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = list(Recipe.objects.only('id'))
+    for recipe in recipes:
+        recipe.short_code = encode_id(recipe.id)
+    Recipe.objects.bulk_update(recipes, ['short_code'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_ingredient_name_upper_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='short_code',
+            field=models.CharField(editable=False, max_length=11, null=True, verbose_name='Код короткой ссылки'),
+        ),
+        migrations.RunPython(fill_short_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='recipe',
+            name='short_code',
+            field=models.CharField(default=recipes.models.generate_short_code, editable=False, max_length=11, unique=True, verbose_name='Код короткой ссылки'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_orphans(apps, schema_editor):
+    """Удаляет связи, оставшиеся от удалённых тегов и ингредиентов."""
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    RecipeTag.objects.filter(tag__isnull=True).delete()
+    RecipeIngredient.objects.filter(ingredient__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_drop_redundant_name_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphans, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='recipeingredient',
+            name='ingredient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredient', to='recipes.ingredient', verbose_name='Ингредиент'),
+        ),
+        migrations.AlterField(
+            model_name='recipetag',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_tag', to='recipes.tag', verbose_name='Тег'),
+        ),
+    ]
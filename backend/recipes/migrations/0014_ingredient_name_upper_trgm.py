@@ -0,0 +1,31 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Триграммный индекс для поиска ингредиентов по вхождению подстроки:
+    icontains в PostgreSQL строится как UPPER(name::text) LIKE UPPER('%...%').
+    """
+
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0013_recipe_counters'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'),
+                    name='gin_trgm_ops'
+                ),
+                name='ingredient_name_upper_trgm'
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_small_integer_amounts'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recipeingredient',
+            options={'verbose_name': 'Ингредиент в Рецепте', 'verbose_name_plural': 'Ингредиенты в Рецепте'},
+        ),
+        migrations.AlterModelOptions(
+            name='recipetag',
+            options={'verbose_name': 'Тег в Рецепте', 'verbose_name_plural': 'Теги в Рецепте'},
+        ),
+    ]
@@ -0,0 +1,38 @@
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_tag_ids(apps, schema_editor):
+    """Заполняет tag_ids по уже существующим связям с тегами."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    Recipe.objects.filter(recipe_tag__isnull=False).update(tag_ids=Subquery(
+        RecipeTag.objects.filter(recipe=OuterRef('pk'))
+        .values('recipe')
+        .annotate(ids=ArrayAgg('tag_id'))
+        .values('ids')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_through_models_no_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tag_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, editable=False, size=None, verbose_name='Id тегов'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_ids'], name='recipe_tag_ids_gin'),
+        ),
+        migrations.RunPython(fill_tag_ids, migrations.RunPython.noop),
+    ]
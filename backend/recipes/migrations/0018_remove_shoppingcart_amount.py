@@ -0,0 +1,16 @@
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipe_tag_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='shoppingcart',
+            name='amount',
+        ),
+    ]
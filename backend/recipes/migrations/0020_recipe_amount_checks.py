@@ -0,0 +1,20 @@
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0019_recipe_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='recipe',
+            constraint=models.CheckConstraint(check=models.Q(('cooking_time__gte', 1)), name='recipe_cooking_time_min'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.CheckConstraint(check=models.Q(('amount__gte', 1)), name='recipe_ingredient_amount_min'),
+        ),
+    ]
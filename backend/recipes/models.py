@@ -1,10 +1,18 @@
+import secrets
+
 from django.contrib.auth import get_user_model
-from django.core.validators import MinValueValidator
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import CheckConstraint, Q, UniqueConstraint
+from django.db.models.functions import Upper
+from seal.models import SealableModel
 
-from .constants import (MAX_SHOW_LENGTH, MIN_COOKING_TIME,
-                        MIN_INGREDIENT_AMOUNT, TAG_CONSTANT)
+from .constants import (BATCH_SIZE, MAX_COOKING_TIME, MAX_INGREDIENT_AMOUNT,
+                        MAX_SHOW_LENGTH, MIN_COOKING_TIME,
+                        MIN_INGREDIENT_AMOUNT, SHORT_CODE_BYTES,
+                        SHORT_CODE_MAX_LENGTH, TAG_CONSTANT)
 
 User = get_user_model()
 
@@ -15,8 +23,7 @@ class Tag(models.Model):
     name = models.CharField(
         verbose_name='Название Тега',
         max_length=TAG_CONSTANT,
-        unique=True,
-        db_index=True
+        unique=True
     )
 
     slug = models.SlugField(
@@ -40,8 +47,7 @@ class Ingredient(models.Model):
     name = models.CharField(
         verbose_name='Название Ингредиента',
         max_length=128,
-        unique=True,
-        db_index=True
+        unique=True
     )
 
     measurement_unit = models.CharField(
@@ -59,18 +65,33 @@ class Ingredient(models.Model):
                 name='unique_ingredient_item',
             )
         ]
+        indexes = [
+            # istartswith строится как UPPER(name::text) LIKE 'X%'.
+            models.Index(
+                OpClass(Upper('name'), name='text_pattern_ops'),
+                name='ingredient_name_upper_idx'
+            ),
+            # icontains строится как UPPER(name::text) LIKE '%X%'.
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='ingredient_name_upper_trgm'
+            )
+        ]
 
     def __str__(self):
         return self.name[:MAX_SHOW_LENGTH]
 
 
-class Recipe(models.Model):
+def generate_short_code():
+    return secrets.token_urlsafe(SHORT_CODE_BYTES)
+
+
+class Recipe(SealableModel):
     """Модель Для Рецептов"""
 
     name = models.CharField(
         verbose_name='Название',
-        max_length=256,
-        db_index=True
+        max_length=256
     )
 
     image = models.ImageField(
@@ -105,11 +126,12 @@ class Recipe(models.Model):
         verbose_name='Теги'
     )
 
-    cooking_time = models.IntegerField(
+    cooking_time = models.PositiveSmallIntegerField(
         verbose_name='Время Приготовления',
         validators=[
             MinValueValidator(MIN_COOKING_TIME,
-                              'Время готовки не может быть меньши минуты')
+                              'Время готовки не может быть меньши минуты'),
+            MaxValueValidator(MAX_COOKING_TIME)
         ]
     )
 
@@ -118,20 +140,73 @@ class Recipe(models.Model):
         verbose_name='Дата Публикации'
     )
 
+    short_code = models.CharField(
+        verbose_name='Код короткой ссылки',
+        max_length=SHORT_CODE_MAX_LENGTH,
+        unique=True,
+        editable=False,
+        default=generate_short_code
+    )
+
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Добавлений в избранное',
+        default=0,
+        editable=False
+    )
+
+    # Копия id тегов из RecipeTag для фильтра без соединения таблиц,
+    # обновляется в recipes.signals.
+    tag_ids = ArrayField(
+        models.BigIntegerField(),
+        verbose_name='Id тегов',
+        default=list,
+        editable=False
+    )
+
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
         constraints = [
             UniqueConstraint(
                 fields=['name', 'author'],
                 name='unique_recipe',
+            ),
+            CheckConstraint(
+                check=Q(cooking_time__gte=MIN_COOKING_TIME),
+                name='recipe_cooking_time_min',
+            )
+        ]
+        indexes = [
+            GinIndex(
+                fields=['name'],
+                name='recipe_name_trgm',
+                opclasses=['gin_trgm_ops']
+            ),
+            GinIndex(fields=['tag_ids'], name='recipe_tag_ids_gin'),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
             )
         ]
 
+    # Эти поля меняются только запросами UPDATE из recipes.signals.
+    derived_fields = frozenset(('favorites_count', 'tag_ids'))
+
     def __str__(self):
         return self.name[:MAX_SHOW_LENGTH]
 
+    def save(self, *args, **kwargs):
+        # Полное сохранение не должно перезаписывать счётчик и tag_ids
+        # значениями, прочитанными до параллельного изменения.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            skipped = self.get_deferred_fields() | self.derived_fields
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
 
 class RecipeTag(models.Model):
     """Промежуточная модель Для Рецептов и их Тегов"""
@@ -140,69 +215,127 @@ class RecipeTag(models.Model):
         Recipe,
         on_delete=models.CASCADE,
         verbose_name='Рецерт',
-        related_name='recipe_tag'
+        related_name='recipe_tag',
+        db_index=False
     )
 
     tag = models.ForeignKey(
         Tag,
-        on_delete=models.SET_NULL,
-        null=True,
+        on_delete=models.CASCADE,
         verbose_name='Тег',
-        related_name='recipe_tag'
+        related_name='recipe_tag',
+        db_index=False
     )
 
     class Meta:
         verbose_name = 'Тег в Рецепте'
         verbose_name_plural = 'Теги в Рецепте'
-        ordering = ['tag']
         constraints = [
             UniqueConstraint(
                 fields=['recipe', 'tag'],
                 name='unique_tag',
             )
         ]
+        indexes = [
+            models.Index(fields=['tag', 'recipe'], name='recipe_tag_rev_idx')
+        ]
 
     def __str__(self):
         return f'{self.recipe} - {self.tag}'
 
 
-class RecipeIngredient(models.Model):
+class RecipeIngredient(SealableModel):
     """Промежуточная модель Для Рецептов и их Ингредиентов"""
 
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
         verbose_name='Рецерт',
-        related_name='recipe_ingredient'
+        related_name='recipe_ingredient',
+        db_index=False
     )
 
     ingredient = models.ForeignKey(
         Ingredient,
-        on_delete=models.SET_NULL,
-        null=True,
+        on_delete=models.CASCADE,
         verbose_name='Ингредиент',
-        related_name='recipe_ingredient'
+        related_name='recipe_ingredient',
+        db_index=False
     )
 
-    amount = models.PositiveIntegerField(
+    amount = models.PositiveSmallIntegerField(
         verbose_name='Количество',
-        validators=[MinValueValidator(MIN_INGREDIENT_AMOUNT)],
+        validators=[
+            MinValueValidator(MIN_INGREDIENT_AMOUNT),
+            MaxValueValidator(MAX_INGREDIENT_AMOUNT)
+        ],
     )
 
     class Meta:
         verbose_name = 'Ингредиент в Рецепте'
         verbose_name_plural = 'Ингредиенты в Рецепте'
-        ordering = ['ingredient']
         constraints = [
             UniqueConstraint(
                 fields=['recipe', 'ingredient'],
                 name='unique_ingredient',
+            ),
+            CheckConstraint(
+                check=Q(amount__gte=MIN_INGREDIENT_AMOUNT),
+                name='recipe_ingredient_amount_min',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['ingredient', 'recipe'],
+                name='recipe_ingredient_rev_idx'
             )
         ]
 
     def __str__(self):
         return f'{self.recipe} - {self.ingredient}'
 
+    @classmethod
+    def bulk_add(cls, recipe, ingredients):
+        """Добавляет ингредиенты рецепту одним INSERT."""
+        cls.objects.bulk_create(
+            (
+                cls(
+                    recipe=recipe,
+                    ingredient=ingredient['ingredient'],
+                    amount=ingredient['amount']
+                )
+                for ingredient in ingredients
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def bulk_set(cls, recipe, ingredients):
+        """
+        Приводит ингредиенты рецепта к списку ingredients: удаляет лишние,
+        меняет количество у оставшихся и добавляет новые.
+        """
+        existing = {
+            item.ingredient_id: item
+            for item in recipe.recipe_ingredient.all()
+        }
+        to_create = []
+        to_update = []
+        for ingredient in ingredients:
+            item = existing.pop(ingredient['ingredient'].id, None)
+            if item is None:
+                to_create.append(ingredient)
+            elif item.amount != ingredient['amount']:
+                item.amount = ingredient['amount']
+                to_update.append(item)
+        if existing:
+            cls.objects.filter(
+                id__in=[item.id for item in existing.values()]
+            ).delete()
+        cls.objects.bulk_update(to_update, ['amount'], batch_size=BATCH_SIZE)
+        cls.bulk_add(recipe, to_create)
+
 
 class Favorite(models.Model):
     """Модель Для добавления рецепта в Избранное"""
@@ -211,7 +344,8 @@ class Favorite(models.Model):
         User,
         verbose_name='Пользователь',
         on_delete=models.CASCADE,
-        related_name='favorites'
+        related_name='favorites',
+        db_index=False
     )
 
     recipe = models.ForeignKey(
@@ -242,7 +376,8 @@ class ShoppingCart(models.Model):
         User,
         verbose_name='Пользователь',
         on_delete=models.CASCADE,
-        related_name='shopping_carts'
+        related_name='shopping_carts',
+        db_index=False
     )
 
     recipe = models.ForeignKey(
@@ -252,8 +387,6 @@ class ShoppingCart(models.Model):
         related_name='shopping_carts'
     )
 
-    amount = models.PositiveIntegerField(default=1)
-
     class Meta:
         verbose_name = 'Список Покупок'
         verbose_name_plural = 'Списки Покупок'
@@ -0,0 +1,61 @@
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import BigIntegerField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Favorite, Recipe, RecipeTag, Tag
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(instance, created, **kwargs):
+    """Увеличивает счётчик рецепта при добавлении в избранное."""
+    if created:
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1
+        )
+
+
+# Из-за этого обработчика Django не удаляет Favorite одним DELETE:
+# сначала выбирает строки, а после удаления обновляет счётчик на каждую.
+# Зато счётчик верен и при каскадном удалении пользователя или рецепта.
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(instance, **kwargs):
+    """Уменьшает счётчик рецепта при удалении из избранного."""
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        favorites_count=F('favorites_count') - 1
+    )
+
+
+def refresh_tag_ids(recipes):
+    """Пересчитывает Recipe.tag_ids по таблице RecipeTag."""
+    recipes.update(tag_ids=Coalesce(
+        Subquery(
+            RecipeTag.objects.filter(recipe=OuterRef('pk'))
+            .values('recipe')
+            .annotate(ids=ArrayAgg('tag_id'))
+            .values('ids')
+        ),
+        Value([], output_field=ArrayField(BigIntegerField()))
+    ))
+
+
+@receiver(m2m_changed, sender=RecipeTag)
+def update_tag_ids(instance, action, reverse, pk_set, **kwargs):
+    """Обновляет tag_ids после изменения тегов рецепта."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recipes = Recipe.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        recipes = Recipe.objects.filter(pk__in=pk_set)
+    else:
+        recipes = Recipe.objects.filter(tag_ids__contains=[instance.pk])
+    refresh_tag_ids(recipes)
+
+
+@receiver(post_delete, sender=Tag)
+def remove_deleted_tag_ids(instance, **kwargs):
+    """Убирает id удалённого тега из рецептов."""
+    refresh_tag_ids(Recipe.objects.filter(tag_ids__contains=[instance.pk]))
@@ -15,4 +15,5 @@ class UserAdmin(UserAdmin):
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
     list_filter = ('user',)
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.3 on 2026-10-15 09:59
+
+from django.db import migrations
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_follow_user'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.SealableUserManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+
+import django.contrib.postgres.fields.citext
+from django.contrib.postgres.operations import CITextExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_user_username'),
+    ]
+
+    operations = [
+        CITextExtension(),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=django.contrib.postgres.fields.citext.CIEmailField(error_messages={'unique': 'Пользователь с такой электронной почтой уже существует'}, max_length=254, unique=True, verbose_name='Адрес электронной почты'),
+        ),
+    ]
@@ -1,13 +1,20 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.postgres.fields import CIEmailField
 from django.db import models
 from django.db.models import UniqueConstraint
+from seal.models import SealableModel
+from seal.query import SealableQuerySet
 
 from .constants import USER_INFO_MAX_LENGTH
 from .validators import validate_username
 
 
-class User(AbstractUser):
+class SealableUserManager(UserManager.from_queryset(SealableQuerySet)):
+    """Менеджер пользователей с поддержкой QuerySet.seal()."""
+
+
+class User(SealableModel, AbstractUser):
     """Модель Для Пользователя"""
 
     USERNAME_FIELD = 'email'
@@ -19,7 +26,7 @@ class User(AbstractUser):
         blank=True
     )
 
-    email = models.EmailField(
+    email = CIEmailField(
         verbose_name='Адрес электронной почты',
         max_length=254,
         unique=True,
@@ -33,7 +40,6 @@ class User(AbstractUser):
         max_length=USER_INFO_MAX_LENGTH,
         validators=[UnicodeUsernameValidator(), validate_username],
         unique=True,
-        db_index=True,
         error_messages={
             'unique': 'Пользователь с таким юзернеймом уже существует'
         }
@@ -49,6 +55,8 @@ class User(AbstractUser):
         max_length=USER_INFO_MAX_LENGTH
     )
 
+    objects = SealableUserManager()
+
     class Meta:
         ordering = ('username',)
         verbose_name = 'Пользватель'
@@ -65,14 +73,16 @@ class Follow(models.Model):
         User,
         verbose_name='Пользователь',
         on_delete=models.CASCADE,
-        related_name='followers'
+        related_name='followers',
+        db_index=False
     )
 
     author = models.ForeignKey(
         User,
         verbose_name='Пользователь',
         on_delete=models.CASCADE,
-        related_name='authors'
+        related_name='authors',
+        db_index=False
     )
 
     class Meta:
@@ -84,6 +94,12 @@ class Follow(models.Model):
                 name='unique_sub',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.user} - {self.author}'
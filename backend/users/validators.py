@@ -1,10 +1,24 @@
 import re
+import string
 
 from django.core.exceptions import ValidationError
 
+USERNAME_PATTERN = re.compile(r'[\w.@+-]+\Z')
+# Для ASCII-имён \w - это буквы, цифры и подчёркивание: если после
+# удаления разрешённых символов ничего не осталось, имя корректно.
+ASCII_USERNAME_CHARS = str.maketrans(
+    '', '', string.ascii_letters + string.digits + '_.@+-'
+)
+
 
 def validate_username(username):
-    if not re.match(r'^[\w.@+-]+\Z', username):
+    if username.isascii():
+        valid = bool(username) and not username.translate(
+            ASCII_USERNAME_CHARS
+        )
+    else:
+        valid = USERNAME_PATTERN.match(username) is not None
+    if not valid:
         raise ValidationError(
             f'Имя пользователя - {username} содержит запрещенные символы'
         )